@@ -1,19 +1,55 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
-from typing import Dict, List
+import torch
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from cachetools import TTLCache
+import anyio
+import asyncio
+import functools
+import hashlib
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 from scraper import InstagramScraper
 from personality_analyzer import PersonalityAnalyzer
+from utils import save_cache, load_cache
 from fastapi.staticfiles import StaticFiles
 
 load_dotenv()
 
-app = FastAPI(title="Instagram Personality Analyzer API")
+# Taille du pool de threads pour les appels bloquants (instaloader, modèles)
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "64"))
+
+# Workers uvicorn : chaque worker charge sa propre copie FP32 des modèles,
+# donc peu de workers sur CPU (un seul sur GPU pour partager le contexte CUDA)
+if os.getenv("DEV"):
+    WORKERS = 1
+else:
+    WORKERS = int(os.getenv("WORKERS", 1 if torch.cuda.is_available() else 2))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Agrandir les pools utilisés par asyncio.to_thread et les routes synchrones
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+    
+    # Répartir les cœurs entre les workers plutôt que tous les prendre dans chacun
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // WORKERS))
+    
+    # Charger les modèles une fois par worker, après le démarrage du process
+    app.state.analyzer = PersonalityAnalyzer()
+    yield
+    await scraper.close()
+
+app = FastAPI(title="Instagram Personality Analyzer API", lifespan=lifespan)
 
 # Configuration CORS
 app.add_middleware(
@@ -24,12 +60,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Instances globales
+# Instances globales (l'analyseur est chargé dans le lifespan)
 scraper = InstagramScraper()
-analyzer = PersonalityAnalyzer()
+
+# Cache des analyses : mémoire (TTL court) puis disque (24h)
+ANALYSIS_CACHE_DIR = os.path.join("cache", "analysis")
+ANALYSIS_CACHE_MAX_AGE_HOURS = 24
+analysis_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+
+# Cache des informations de profil (10 minutes)
+profile_info_cache: TTLCache = TTLCache(maxsize=512, ttl=600)
+
+INSTAGRAM_USERNAME_RE = re.compile(r'instagram\.com/([^/?#]+)')
 
 class AnalysisRequest(BaseModel):
     instagram_url: str
+    max_posts: int = Field(10, ge=1, le=50)
 
 class AnalysisResponse(BaseModel):
     personality_traits: Dict[str, float]
@@ -52,18 +98,25 @@ async def analyze_profile(request: AnalysisRequest):
         # Extraire le nom d'utilisateur de l'URL
         username = extract_username(request.instagram_url)
         
+        # Vérifier le cache des analyses
+        cache_key = analysis_cache_key(username, request.max_posts)
+        cached_response = await get_cached_analysis(cache_key)
+        if cached_response:
+            print(f"Using cached analysis for {username}")
+            return cached_response
+        
         # Scraper les données Instagram
         print(f"Scraping data for {username}...")
-        scraped_data = await scraper.scrape_profile(username)
+        scraped_data = await scraper.scrape_profile(username, request.max_posts)
         
         # Récupérer les informations du profil
-        profile_info = await scraper.get_profile_info(username)
+        profile_info = await get_profile_info(username)
         
         if not scraped_data or len(scraped_data) == 0:
             raise HTTPException(status_code=404, detail="No data found for this profile")
         # Analyser la personnalité
         print("Analyzing personality...")
-        personality_results = await analyzer.analyze(scraped_data)
+        personality_results = await app.state.analyzer.analyze(scraped_data)
         
         # Préparer la réponse
         response = {
@@ -75,24 +128,60 @@ async def analyze_profile(request: AnalysisRequest):
             "profile_info": profile_info,
         }
         
+        # Sauvegarder en cache (mémoire + disque)
+        analysis_cache[cache_key] = response
+        await asyncio.to_thread(save_cache, cache_key, response, ANALYSIS_CACHE_DIR)
+        
         return response
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def analysis_cache_key(username: str, max_posts: int) -> str:
+    """Générer la clé de cache d'une analyse"""
+    return hashlib.sha256(f"{username}:{max_posts}".encode()).hexdigest()
+
+async def get_cached_analysis(cache_key: str) -> Optional[Dict]:
+    """Chercher une analyse en mémoire, puis sur disque"""
+    cached = analysis_cache.get(cache_key)
+    if cached is None:
+        # Lecture disque hors de l'event loop
+        cached = await asyncio.to_thread(
+            load_cache, cache_key, ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_AGE_HOURS
+        )
+        if cached:
+            analysis_cache[cache_key] = cached
+    return cached
+
+async def get_profile_info(username: str) -> Dict:
+    """Récupérer les infos du profil, en passant par le cache"""
+    profile_info = profile_info_cache.get(username)
+    if profile_info is None:
+        profile_info = await scraper.get_profile_info(username)
+        if profile_info:
+            profile_info_cache[username] = profile_info
+    return profile_info
+
+@functools.lru_cache(maxsize=4096)
 def extract_username(url: str) -> str:
     """Extraire le nom d'utilisateur de l'URL Instagram"""
-    url = url.rstrip('/')
-    parts = url.split('/')
-    
     # Format: https://www.instagram.com/username/
-    if 'instagram.com' in url:
-        for i, part in enumerate(parts):
-            if part == 'instagram.com' and i + 1 < len(parts):
-                return parts[i + 1]
+    match = INSTAGRAM_USERNAME_RE.search(url)
+    if match:
+        return match.group(1)
     
     # Si c'est juste le nom d'utilisateur
-    return parts[-1]
+    return url.rstrip('/').split('/')[-1]
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    if os.getenv("DEV"):
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=WORKERS,
+            loop="auto",
+            http="auto"
+        )
\ No newline at end of file
@@ -1,27 +1,145 @@
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, ViTImageProcessor, ViTForImageClassification
 import torch
+import torch.nn.functional as F
 from PIL import Image
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import base64
-import io
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
+import tempfile
+
+try:
+    from torchvision.io import decode_jpeg, ImageReadMode
+except ImportError:
+    decode_jpeg = None
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTModelForImageClassification
+except ImportError:
+    ORTModelForSequenceClassification = None
+    ORTModelForImageClassification = None
+
+# Longueur maximale des textes (formes statiques si torch.compile est utilisé)
+TEXT_MAX_LENGTH = 256
+IMAGE_SIZE = 224
+
+# Nombre maximum de textes par forward, pour limiter la mémoire
+TEXT_BATCH_SIZE = 50
+
+JPEG_MAGIC = b"\xff\xd8"
+
+# Géométrie du graphique radar SVG
+RADAR_SIZE = 400
+RADAR_CENTER = RADAR_SIZE / 2
+RADAR_RADIUS = 140
+
+# Modèles ONNX quantifiés en INT8 (inférence CPU, voir README)
+ONNX_TEXT_MODEL_DIR = os.getenv("ONNX_TEXT_MODEL_DIR", "models/xlm-roberta-base-int8")
+ONNX_IMAGE_MODEL_DIR = os.getenv("ONNX_IMAGE_MODEL_DIR", "models/vit-base-int8")
+
+
+def _load_image(path: str):
+    """Décoder une image en RGB (exécuté dans un thread)"""
+    try:
+        image = Image.open(path)
+        # Laisser libjpeg réduire l'image pendant le décodage
+        image.draft("RGB", (IMAGE_SIZE, IMAGE_SIZE))
+        return image.convert("RGB")
+    except Exception as e:
+        print(f"Error processing image: {str(e)}")
+        return None
+
+
+def _read_image_bytes(path: str):
+    """Lire le contenu brut d'une image (exécuté dans un thread)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except Exception as e:
+        print(f"Error processing image: {str(e)}")
+        return None
+
+
+def _onnx_models_available() -> bool:
+    """Vérifier que ONNX Runtime et les modèles INT8 exportés sont présents"""
+    return (
+        ORTModelForSequenceClassification is not None
+        and os.path.isdir(ONNX_TEXT_MODEL_DIR)
+        and os.path.isdir(ONNX_IMAGE_MODEL_DIR)
+    )
+
 
 class PersonalityAnalyzer:
     def __init__(self):
         print("Loading models...")
         
+        # Utiliser le GPU si disponible (FP16 uniquement sur CUDA)
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.use_fp16 = self.device == "cuda"
+        # Sur CPU, préférer ONNX Runtime INT8 si les modèles ont été exportés
+        self.use_onnx = self.device == "cpu" and _onnx_models_available()
+        # Charger directement dans la bonne précision
+        torch_dtype = torch.float16 if self.use_fp16 else torch.float32
+        
+        # Features par post (logits texte/image) mises en cache sur disque
+        self.features_cache_dir = os.path.join("cache", "features")
+        
         # Charger XLM-RoBERTa pour l'analyse de texte
-        self.text_tokenizer = AutoTokenizer.from_pretrained("xlm-roberta-base")
-        self.text_model = AutoModelForSequenceClassification.from_pretrained(
+        # Forcer le tokenizer rapide (Rust) plutôt que SentencePiece en Python
+        self.text_tokenizer = AutoTokenizer.from_pretrained(
             "xlm-roberta-base",
-            num_labels=5  # Big Five personality traits
+            use_fast=True,
+            model_max_length=512
         )
+        if self.use_onnx:
+            self.text_model = ORTModelForSequenceClassification.from_pretrained(ONNX_TEXT_MODEL_DIR)
+        else:
+            self.text_model = AutoModelForSequenceClassification.from_pretrained(
+                "xlm-roberta-base",
+                num_labels=5,  # Big Five personality traits
+                torch_dtype=torch_dtype
+            )
         
         # Charger Vision Transformer pour l'analyse d'images
-        self.image_processor = ViTImageProcessor.from_pretrained('google/vit-base-patch16-224')
-        self.image_model = ViTForImageClassification.from_pretrained('google/vit-base-patch16-224')
+        self.image_processor = ViTImageProcessor.from_pretrained(
+            'google/vit-base-patch16-224',
+            size={"height": IMAGE_SIZE, "width": IMAGE_SIZE}
+        )
+        if self.use_onnx:
+            self.image_model = ORTModelForImageClassification.from_pretrained(ONNX_IMAGE_MODEL_DIR)
+        else:
+            self.image_model = ViTForImageClassification.from_pretrained(
+                'google/vit-base-patch16-224',
+                torch_dtype=torch_dtype
+            )
+        
+        # Décodage JPEG sur GPU (nvJPEG) avec normalisation pré-calculée
+        self.gpu_decode = self.device == "cuda" and decode_jpeg is not None
+        self._pixel_mean = torch.tensor(
+            self.image_processor.image_mean, device=self.device
+        ).view(1, 3, 1, 1)
+        self._pixel_std = torch.tensor(
+            self.image_processor.image_std, device=self.device
+        ).view(1, 3, 1, 1)
+        
+        # Padding fixe uniquement si les modèles sont compilés
+        self.static_shapes = False
+        compiled = False
+        if not self.use_onnx:
+            # Déplacer les modèles sur le device et passer en mode inférence
+            self.text_model = self._prepare_model(self.text_model)
+            self.image_model = self._prepare_model(self.image_model)
+            
+            # Compiler les forwards (warmup inclus)
+            compiled = self._compile_models()
+        
+        # Payer l'initialisation au démarrage pour les modèles non compilés
+        if not compiled:
+            try:
+                self._warmup()
+            except Exception as e:
+                print(f"Model warmup failed: {str(e)}")
         
         # Traits de personnalité Big Five
         self.personality_traits = [
@@ -32,12 +150,102 @@ class PersonalityAnalyzer:
             "Neuroticism"
         ]
         
-        print("Models loaded successfully")
+        # Angles du radar et fond SVG pré-calculés
+        self._angles = np.linspace(0, 2 * np.pi, len(self.personality_traits), endpoint=False)
+        self._cos = np.cos(self._angles)
+        self._sin = np.sin(self._angles)
+        self._svg_background = self._build_svg_background()
+        
+        backend = "onnxruntime-int8" if self.use_onnx else "pytorch"
+        print(f"Models loaded successfully on {self.device} ({backend})")
+    
+    def _prepare_model(self, model):
+        """Déplacer un modèle sur le device (FP16 sur GPU)"""
+        model = model.to(self.device)
+        if self.use_fp16:
+            model = model.half()
+        return model.eval()
+    
+    def _compile_models(self) -> bool:
+        """Compiler les modèles avec torch.compile, retour en eager si échec"""
+        if not hasattr(torch, "compile"):
+            return False
+        
+        eager_text_model, eager_image_model = self.text_model, self.image_model
+        try:
+            # Mode par défaut, sans CUDA graphs : ceux-ci sont liés au thread
+            # alors que les forwards tournent dans le pool de asyncio.to_thread
+            self.text_model = torch.compile(eager_text_model, fullgraph=False)
+            self.image_model = torch.compile(eager_image_model, fullgraph=False)
+            # Formes statiques pour éviter les recompilations
+            self.static_shapes = True
+            # torch.compile est paresseux : la compilation a lieu ici
+            self._warmup()
+            return True
+        except Exception as e:
+            print(f"torch.compile failed, using eager mode: {str(e)}")
+            self.text_model, self.image_model = eager_text_model, eager_image_model
+            self.static_shapes = False
+            return False
+    
+    def _warmup(self):
+        """Exécuter un forward factice de chaque forme statique"""
+        # Dynamo spécialise les dimensions de taille 1 : un batch de 2 compile
+        # aussi le graphe à batch dynamique, sinon recompilé à la première requête
+        for batch_size in (1, 2):
+            text_inputs = self._tokenize(["warmup"] * batch_size)
+            image_inputs = {
+                "pixel_values": torch.zeros(
+                    batch_size, 3, IMAGE_SIZE, IMAGE_SIZE, device=self.device
+                )
+            }
+            self._forward(self.text_model, text_inputs)
+            self._forward(self.image_model, image_inputs)
+    
+    def _tokenize(self, texts: List[str]):
+        """Tokenizer et déplacer les tenseurs sur le device"""
+        inputs = self.text_tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            max_length=TEXT_MAX_LENGTH,
+            # Padding au plus long texte du batch, sauf pour les modèles compilés
+            padding="max_length" if self.static_shapes else "longest",
+            return_attention_mask=True,
+            return_token_type_ids=False
+        )
+        return {k: v.to(self.device) for k, v in inputs.items()}
+    
+    def _inference_context(self):
+        """Contexte d'inférence : autocast FP16 sur GPU, FP32 sur CPU"""
+        return torch.autocast(
+            device_type=self.device,
+            dtype=torch.float16,
+            enabled=self.use_fp16
+        )
+    
+    def _forward(self, model, inputs: Dict) -> torch.Tensor:
+        """Exécuter un forward et retourner les logits en FP32 (appelé dans un thread)"""
+        with self._inference_context(), torch.no_grad():
+            return model(**inputs).logits.float()
     
     async def analyze(self, posts_data: List[Dict]) -> Dict:
         """Analyser la personnalité à partir des posts"""
-        text_scores = await self._analyze_text(posts_data)
-        image_scores = await self._analyze_images(posts_data)
+        # Charger les features déjà calculées pour ces posts
+        cached_features = await asyncio.to_thread(self._load_post_features, posts_data)
+        
+        (text_scores, text_features), (image_scores, image_features) = await asyncio.gather(
+            self._analyze_text(posts_data, cached_features),
+            self._analyze_images(posts_data, cached_features)
+        )
+        
+        # Sauvegarder les features nouvellement calculées (texte et image indépendamment)
+        new_features = {}
+        for kind, computed in (("text", text_features), ("image", image_features)):
+            for post_id, array in computed.items():
+                new_features.setdefault(post_id, {})[kind] = array
+        if new_features:
+            await asyncio.to_thread(self._save_post_features, new_features)
         
         # Combiner les scores (moyenne pondérée)
         combined_scores = {}
@@ -57,110 +265,326 @@ class PersonalityAnalyzer:
             "visualization": visualization
         }
     
-    async def _analyze_text(self, posts_data: List[Dict]) -> Dict[str, float]:
+    def _features_path(self, post_id: str, kind: str) -> str:
+        """Chemin du fichier de features ("text" ou "image") d'un post"""
+        return os.path.join(self.features_cache_dir, f"{post_id}.{kind}.npy")
+    
+    def _load_post_features(self, posts_data: List[Dict]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Charger les features en cache des posts (appel bloquant)"""
+        features = {}
+        
+        for post in posts_data:
+            post_id = post.get("id")
+            if not post_id:
+                continue
+            # Chaque moitié est chargée séparément : un post peut n'avoir que l'une des deux
+            for kind in ("text", "image"):
+                try:
+                    array = np.load(self._features_path(post_id, kind))
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    print(f"Error loading features: {str(e)}")
+                    continue
+                features.setdefault(post_id, {})[kind] = array
+        
+        return features
+    
+    def _save_post_features(self, features: Dict[str, Dict[str, np.ndarray]]):
+        """Sauvegarder les features de chaque post (appel bloquant)"""
+        try:
+            os.makedirs(self.features_cache_dir, exist_ok=True)
+            for post_id, arrays in features.items():
+                for kind, array in arrays.items():
+                    path = self._features_path(post_id, kind)
+                    # Nom temporaire unique : pas de collision entre écrivains concurrents
+                    fd, tmp_path = tempfile.mkstemp(
+                        prefix=f"{post_id}.{kind}.", suffix=".tmp", dir=self.features_cache_dir
+                    )
+                    try:
+                        with os.fdopen(fd, "wb") as f:
+                            np.save(f, array)
+                        os.replace(tmp_path, path)
+                    except Exception:
+                        os.remove(tmp_path)
+                        raise
+        except Exception as e:
+            print(f"Error saving features: {str(e)}")
+    
+    async def _analyze_text(
+        self,
+        posts_data: List[Dict],
+        cached_features: Dict[str, Dict[str, np.ndarray]]
+    ) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
         """Analyser les textes (captions et commentaires)"""
-        all_text = []
+        rows = []  # Probabilités par texte, regroupées par post
+        computed = {}
+        missing = []
+        texts = []
         
         for post in posts_data:
+            cached = cached_features.get(post.get("id"), {}).get("text")
+            if cached is not None:
+                rows.append(cached)
+                continue
+            
+            post_texts = []
             if post.get("caption"):
-                all_text.append(post["caption"])
+                post_texts.append(post["caption"])
             if post.get("comments"):
-                all_text.extend(post["comments"])
+                post_texts.extend(post["comments"])
+            missing.append((post.get("id"), len(post_texts)))
+            texts.extend(post_texts)
         
-        if not all_text:
-            return {trait: 0.5 for trait in self.personality_traits}
+        # Le modèle ne tourne que sur les posts sans cache
+        if texts:
+            probs = await self._text_probabilities(texts)
+        else:
+            probs = np.empty((0, len(self.personality_traits)), dtype=np.float32)
         
-        # Limiter le texte pour éviter les problèmes de mémoire
-        text_sample = " ".join(all_text[:50])
+        offset = 0
+        for post_id, count in missing:
+            post_probs = probs[offset:offset + count]
+            offset += count
+            rows.append(post_probs)
+            if post_id:
+                computed[post_id] = post_probs
         
-        # Tokenizer et analyser
-        inputs = self.text_tokenizer(
-            text_sample,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-            padding=True
-        )
+        rows = [post_probs for post_probs in rows if len(post_probs)]
+        if not rows:
+            return {trait: 0.5 for trait in self.personality_traits}, computed
+        
+        # Moyenner les probabilités sur tous les textes
+        scores = np.concatenate(rows).mean(axis=0)
+        
+        # Mapper aux traits de personnalité (0.5 pour les traits sans sortie)
+        num_traits = len(self.personality_traits)
+        scores = np.pad(scores, (0, max(0, num_traits - len(scores))), constant_values=0.5)[:num_traits]
         
-        with torch.no_grad():
-            outputs = self.text_model(**inputs)
-            logits = outputs.logits
-            scores = torch.softmax(logits, dim=1)[0].numpy()
+        return dict(zip(self.personality_traits, scores.tolist())), computed
+    
+    async def _text_probabilities(self, texts: List[str]) -> np.ndarray:
+        """Calculer les probabilités des traits pour chaque texte"""
+        # Tokenisation, forward et copie vers le CPU hors de l'event loop
+        return await asyncio.to_thread(self._compute_text_probabilities, texts)
+    
+    def _compute_text_probabilities(self, texts: List[str]) -> np.ndarray:
+        """Tokenizer les textes et calculer leurs probabilités (appelé dans un thread)"""
+        chunks = []
         
-        # Mapper aux traits de personnalité
-        text_scores = {}
-        for i, trait in enumerate(self.personality_traits):
-            text_scores[trait] = float(scores[i] if i < len(scores) else 0.5)
+        # Limiter la taille des batchs pour éviter les problèmes de mémoire
+        for start in range(0, len(texts), TEXT_BATCH_SIZE):
+            # Tokenizer chaque texte séparément, en un seul batch (B, 256)
+            inputs = self._tokenize(texts[start:start + TEXT_BATCH_SIZE])
+            logits = self._forward(self.text_model, inputs)
+            # .cpu() attend la fin des kernels : à faire ici, pas dans l'event loop
+            chunks.append(torch.softmax(logits, dim=-1).cpu().numpy())
         
-        return text_scores
+        return np.concatenate(chunks)
     
-    async def _analyze_images(self, posts_data: List[Dict]) -> Dict[str, float]:
+    async def _analyze_images(
+        self,
+        posts_data: List[Dict],
+        cached_features: Dict[str, Dict[str, np.ndarray]]
+    ) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
         """Analyser les images"""
-        image_features = []
+        rows = []  # Logits par image
+        computed = {}
+        pending = []
         
         for post in posts_data:
-            if post.get("image_path"):
-                try:
-                    image = Image.open(post["image_path"]).convert("RGB")
-                    inputs = self.image_processor(images=image, return_tensors="pt")
-                    
-                    with torch.no_grad():
-                        outputs = self.image_model(**inputs)
-                        features = outputs.logits[0].numpy()
-                        image_features.append(features)
-                except Exception as e:
-                    print(f"Error processing image: {str(e)}")
-                    continue
+            post_id = post.get("id")
+            cached = cached_features.get(post_id, {}).get("image")
+            if cached is not None:
+                rows.append(cached)
+            elif post.get("image_path"):
+                pending.append((post_id, post["image_path"]))
+            elif post_id and post.get("is_video"):
+                # Vidéo sans image : mémoriser une feature vide
+                computed[post_id] = np.empty(0, dtype=np.float32)
+            # Téléchargement échoué : ne rien mettre en cache, on réessaiera
         
-        if not image_features:
-            return {trait: 0.5 for trait in self.personality_traits}
+        # Le modèle ne tourne que sur les images sans cache
+        logits, post_ids = await self._image_logits(pending)
+        for post_id, image_logits in zip(post_ids, logits):
+            rows.append(image_logits)
+            if post_id:
+                computed[post_id] = image_logits
+        
+        rows = [image_logits for image_logits in rows if image_logits.size]
+        if not rows:
+            return {trait: 0.5 for trait in self.personality_traits}, computed
         
         # Moyenner les features
-        avg_features = np.mean(image_features, axis=0)
+        avg_features = np.mean(rows, axis=0)
         
         # Mapper aux traits (simplifié)
-        image_scores = {}
         normalized = (avg_features - avg_features.min()) / (avg_features.max() - avg_features.min() + 1e-8)
+        num_traits = len(self.personality_traits)
+        idxs = (np.arange(num_traits) * len(normalized)) // num_traits
         
-        for i, trait in enumerate(self.personality_traits):
-            idx = (i * len(normalized)) // len(self.personality_traits)
-            image_scores[trait] = float(normalized[idx])
+        return dict(zip(self.personality_traits, normalized[idxs].tolist())), computed
+    
+    async def _image_logits(self, pending: List[Tuple[Optional[str], str]]):
+        """Décoder les images (post_id, chemin) et calculer leurs logits en un batch"""
+        jpeg_items = []
         
-        return image_scores
+        # Lire / décoder les fichiers en parallèle sans bloquer l'event loop
+        # Les JPEG sont décodés sur le GPU, le reste passe par Pillow
+        if self.gpu_decode:
+            raw_images = await asyncio.gather(*[
+                asyncio.to_thread(_read_image_bytes, path) for _, path in pending
+            ])
+            jpeg_items = [
+                (post_id, path, data) for (post_id, path), data in zip(pending, raw_images)
+                if data and data.startswith(JPEG_MAGIC)
+            ]
+            pil_items = [
+                (post_id, path) for (post_id, path), data in zip(pending, raw_images)
+                if data and not data.startswith(JPEG_MAGIC)
+            ]
+        else:
+            pil_items = pending
+        
+        loaded = await asyncio.gather(*[
+            asyncio.to_thread(_load_image, path) for _, path in pil_items
+        ])
+        images = [
+            (post_id, image) for (post_id, _), image in zip(pil_items, loaded)
+            if image is not None
+        ]
+        
+        if not jpeg_items and not images:
+            return [], []
+        
+        # Prétraitement, forward et copie vers le CPU hors de l'event loop
+        return await asyncio.to_thread(self._compute_image_logits, jpeg_items, images)
     
-    def _generate_visualization(self, scores: Dict[str, float]) -> str:
-        """Générer un graphique radar des traits de personnalité"""
-        fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
+    def _compute_image_logits(
+        self,
+        jpeg_items: List[Tuple[Optional[str], str, bytes]],
+        images: List[Tuple[Optional[str], Image.Image]]
+    ):
+        """Prétraiter les images et calculer leurs logits (appelé dans un thread)"""
+        batches = []
+        post_ids = []
         
-        # Préparer les données
-        traits = list(scores.keys())
-        values = list(scores.values())
+        if jpeg_items:
+            pixel_values, jpeg_ids, failed = self._preprocess_jpegs_gpu(jpeg_items)
+            if pixel_values is not None:
+                batches.append(pixel_values)
+                post_ids.extend(jpeg_ids)
+            # JPEG non supportés par nvJPEG (progressifs, CMYK...) : repli sur Pillow
+            for post_id, path in failed:
+                image = _load_image(path)
+                if image is not None:
+                    images.append((post_id, image))
         
-        # Ajouter le premier point à la fin pour fermer le radar
-        values += values[:1]
+        if images:
+            inputs = self.image_processor(
+                images=[image for _, image in images],
+                return_tensors="pt"
+            )
+            batches.append(inputs["pixel_values"].to(self.device))
+            post_ids.extend(post_id for post_id, _ in images)
         
-        # Calculer les angles
-        angles = np.linspace(0, 2 * np.pi, len(traits), endpoint=False).tolist()
-        angles += angles[:1]
+        if not batches:
+            return [], []
         
-        # Tracer
-        ax.plot(angles, values, 'o-', linewidth=2, color='#4CAF50')
-        ax.fill(angles, values, alpha=0.25, color='#4CAF50')
-        ax.set_ylim(0, 1)
+        # Un seul forward batché (N, 3, 224, 224) pour toutes les images
+        pixel_values = torch.cat(batches)
+        logits = self._forward(self.image_model, {"pixel_values": pixel_values})
+        # .cpu() attend la fin des kernels : à faire ici, pas dans l'event loop
+        return logits.cpu().numpy(), post_ids
+    
+    def _preprocess_jpegs_gpu(self, jpeg_items: List[Tuple[Optional[str], str, bytes]]):
+        """Décoder, redimensionner et normaliser des JPEG directement sur le GPU
+        
+        Retourne aussi les (post_id, chemin) que nvJPEG n'a pas pu décoder.
+        """
+        frames = []
+        post_ids = []
+        failed = []
+        
+        for post_id, path, data in jpeg_items:
+            try:
+                encoded = torch.frombuffer(bytearray(data), dtype=torch.uint8)
+                image = decode_jpeg(encoded, mode=ImageReadMode.RGB, device=self.device)
+                frames.append(F.interpolate(
+                    image.unsqueeze(0).float(),
+                    size=(IMAGE_SIZE, IMAGE_SIZE),
+                    mode="bilinear",
+                    align_corners=False,
+                    antialias=True
+                ))
+                post_ids.append(post_id)
+            except Exception as e:
+                print(f"GPU JPEG decode failed, falling back to Pillow: {str(e)}")
+                failed.append((post_id, path))
         
-        # Labels
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(traits, size=12)
-        ax.set_yticks([0.2, 0.4, 0.6, 0.8, 1.0])
-        ax.set_yticklabels(['20%', '40%', '60%', '80%', '100%'], size=10)
-        ax.set_title('Personality Traits Analysis', size=16, pad=20)
-        ax.grid(True)
+        if not frames:
+            return None, [], failed
+        
+        pixel_values = torch.cat(frames) / 255.0
+        return (pixel_values - self._pixel_mean) / self._pixel_std, post_ids, failed
+    
+    def _radar_points(self, values: np.ndarray):
+        """Convertir des scores (0-1) en coordonnées SVG sur les axes du radar"""
+        xs = RADAR_CENTER + RADAR_RADIUS * values * self._cos
+        ys = RADAR_CENTER - RADAR_RADIUS * values * self._sin
+        return xs, ys
+    
+    def _build_svg_background(self) -> str:
+        """Construire la partie statique du radar (grille, axes, labels)"""
+        parts = [
+            f'<text x="{RADAR_CENTER}" y="24" text-anchor="middle" font-size="18">'
+            'Personality Traits Analysis</text>'
+        ]
+        
+        # Cercles de la grille et pourcentages
+        for level in (0.2, 0.4, 0.6, 0.8, 1.0):
+            radius = RADAR_RADIUS * level
+            parts.append(
+                f'<circle cx="{RADAR_CENTER}" cy="{RADAR_CENTER}" r="{radius:.1f}" '
+                'fill="none" stroke="#ddd"/>'
+            )
+            parts.append(
+                f'<text x="{RADAR_CENTER + 3}" y="{RADAR_CENTER - radius - 2:.1f}" '
+                f'font-size="10" fill="#888">{int(level * 100)}%</text>'
+            )
+        
+        # Axes et noms des traits
+        xs, ys = self._radar_points(np.ones(len(self._angles)))
+        label_xs, label_ys = self._radar_points(np.full(len(self._angles), 1.12))
+        for trait, x, y, lx, ly in zip(self.personality_traits, xs, ys, label_xs, label_ys):
+            parts.append(
+                f'<line x1="{RADAR_CENTER}" y1="{RADAR_CENTER}" x2="{x:.1f}" y2="{y:.1f}" stroke="#ddd"/>'
+            )
+            parts.append(
+                f'<text x="{lx:.1f}" y="{ly:.1f}" text-anchor="middle" '
+                f'dominant-baseline="middle" font-size="12">{trait}</text>'
+            )
+        
+        return "".join(parts)
+    
+    def _generate_visualization(self, scores: Dict[str, float]) -> str:
+        """Générer un graphique radar SVG des traits de personnalité"""
+        # Préparer les données dans l'ordre des axes
+        values = np.array([scores.get(trait, 0.5) for trait in self.personality_traits])
+        xs, ys = self._radar_points(np.clip(values, 0.0, 1.0))
+        points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+        markers = "".join(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="#4CAF50"/>' for x, y in zip(xs, ys))
+        
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{RADAR_SIZE}" height="{RADAR_SIZE}" '
+            f'viewBox="0 0 {RADAR_SIZE} {RADAR_SIZE}" font-family="sans-serif">'
+            f'{self._svg_background}'
+            f'<polygon points="{points}" fill="#4CAF50" fill-opacity="0.25" '
+            'stroke="#4CAF50" stroke-width="2"/>'
+            f'{markers}</svg>'
+        )
         
         # Convertir en base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        image_base64 = base64.b64encode(svg.encode()).decode()
         
-        return f"data:image/png;base64,{image_base64}"
\ No newline at end of file
+        return f"data:image/svg+xml;base64,{image_base64}"
\ No newline at end of file
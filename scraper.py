@@ -1,4 +1,6 @@
 import instaloader
+import httpx
+from cachetools import TTLCache
 import os
 from typing import List, Dict, Optional
 import asyncio
@@ -38,8 +40,26 @@ class InstagramScraper:
         self.download_dir = "downloads"
         self.cache_dir = "cache"
         self.use_cache = use_cache
+        self.cache_max_age_hours = 24  # Durée de vie du cache disque
         self.rate_limit_delay = 2  # Secondes entre les requêtes
         
+        # Cache mémoire devant le cache disque (15 minutes)
+        self._mem_cache = TTLCache(maxsize=256, ttl=900)
+        
+        # Client HTTP partagé pour télécharger les images en parallèle :
+        # les connexions keep-alive évitent un handshake TLS par image
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            follow_redirects=True,
+            headers={"User-Agent": self.loader.context.user_agent},
+            limits=httpx.Limits(
+                max_keepalive_connections=10,
+                max_connections=10,
+                keepalive_expiry=60.0
+            )
+        )
+        
         # Créer les dossiers nécessaires
         os.makedirs(self.download_dir, exist_ok=True)
         os.makedirs(self.cache_dir, exist_ok=True)
@@ -59,10 +79,10 @@ class InstagramScraper:
         if not validate_username(username):
             raise ValueError(f"Invalid username: {username}")
         
-        # Vérifier le cache
+        # Vérifier le cache (mémoire puis disque)
         if self.use_cache:
             cache_key = generate_cache_key(username, max_posts)
-            cached_data = load_cache(cache_key, self.cache_dir)
+            cached_data = await self._load_cached_posts(cache_key)
             if cached_data:
                 print(f"Using cached data for {username}")
                 return cached_data
@@ -70,9 +90,10 @@ class InstagramScraper:
         try:
             print(f"Fetching profile: {username}")
             
-            # Charger le profil
-            profile = instaloader.Profile.from_username(
-                self.loader.context, 
+            # Charger le profil (appel bloquant exécuté dans un thread)
+            profile = await asyncio.to_thread(
+                instaloader.Profile.from_username,
+                self.loader.context,
                 username
             )
             
@@ -89,7 +110,7 @@ class InstagramScraper:
             # Sauvegarder en cache
             if self.use_cache and posts_data:
                 cache_key = generate_cache_key(username, max_posts)
-                save_cache(cache_key, posts_data, self.cache_dir)
+                await self._save_cached_posts(cache_key, posts_data)
             
             return posts_data
         
@@ -101,6 +122,69 @@ class InstagramScraper:
             print(f"Error scraping profile: {str(e)}")
             raise Exception(f"Failed to scrape profile: {str(e)}")
     
+    def _cache_shard_dir(self, cache_key: str) -> str:
+        """
+        Obtenir le sous-dossier de cache d'une clé
+        
+        Args:
+            cache_key: Clé de cache
+            
+        Returns:
+            Chemin du sous-dossier ({cache_dir}/{key[:2]})
+        """
+        return os.path.join(self.cache_dir, cache_key[:2])
+    
+    async def _load_cached_posts(self, cache_key: str) -> Optional[List[Dict]]:
+        """
+        Charger les posts depuis le cache mémoire, puis disque
+        
+        Args:
+            cache_key: Clé de cache
+            
+        Returns:
+            Liste des données de posts ou None
+        """
+        cached_posts = self._mem_cache.get(cache_key)
+        if cached_posts is not None:
+            return cached_posts
+        
+        # Lecture disque hors de l'event loop
+        entry = await asyncio.to_thread(
+            load_cache,
+            cache_key,
+            self._cache_shard_dir(cache_key),
+            self.cache_max_age_hours
+        )
+        if not isinstance(entry, dict):
+            return None
+        
+        # Ignorer les entrées plus anciennes que le TTL
+        age = time.time() - entry.get("saved_at", 0)
+        if age > self.cache_max_age_hours * 3600:
+            return None
+        
+        cached_posts = entry.get("posts")
+        if cached_posts:
+            self._mem_cache[cache_key] = cached_posts
+        return cached_posts
+    
+    async def _save_cached_posts(self, cache_key: str, posts_data: List[Dict]):
+        """
+        Sauvegarder les posts dans le cache mémoire et disque
+        
+        Args:
+            cache_key: Clé de cache
+            posts_data: Liste des données de posts
+        """
+        self._mem_cache[cache_key] = posts_data
+        # Écriture disque hors de l'event loop
+        await asyncio.to_thread(
+            save_cache,
+            cache_key,
+            {"saved_at": time.time(), "posts": posts_data},
+            self._cache_shard_dir(cache_key)
+        )
+    
     async def _scrape_posts(self, profile, user_dir: str, max_posts: int) -> List[Dict]:
         """
         Scraper les posts d'un profil
@@ -114,12 +198,18 @@ class InstagramScraper:
             Liste des données de posts
         """
         posts_data = []
+        downloads = []
         post_count = 0
         
         print(f"Total posts available: {profile.mediacount}")
         
-        for post in profile.get_posts():
-            if post_count >= max_posts:
+        # L'itérateur d'instaloader fait des requêtes bloquantes : chaque
+        # élément est récupéré dans un thread pour libérer l'event loop
+        posts = await asyncio.to_thread(profile.get_posts)
+        
+        while post_count < max_posts:
+            post = await asyncio.to_thread(next, posts, None)
+            if post is None:
                 break
             
             try:
@@ -127,29 +217,17 @@ class InstagramScraper:
                 if post_count > 0:
                     await asyncio.sleep(self.rate_limit_delay)
                 
-                # Télécharger l'image
-                image_path = await self._download_image(post, user_dir)
-                
-                # Extraire les données du post
-                post_data = {
-                    "id": post.shortcode,
-                    "caption": post.caption if post.caption else "",
-                    "likes": post.likes,
-                    "comments_count": post.comments,
-                    "date": post.date_utc.isoformat(),
-                    "image_path": image_path,
-                    "is_video": post.is_video,
-                    "hashtags": extract_hashtags(post.caption if post.caption else ""),
-                    "mentions": extract_mentions(post.caption if post.caption else ""),
-                    "location": post.location.name if post.location else None,
-                    "url": f"https://www.instagram.com/p/{post.shortcode}/"
-                }
+                # Extraire les données du post (certaines propriétés, comme
+                # location, font des requêtes bloquantes)
+                post_data = await asyncio.to_thread(self._post_metadata, post)
                 
                 # Extraire quelques commentaires
                 comments = await self._extract_comments(post, max_comments=5)
                 post_data["comments"] = comments
                 
                 posts_data.append(post_data)
+                # Le téléchargement de l'image est lancé après le listing
+                downloads.append(self._download_image(post, user_dir))
                 post_count += 1
                 
                 print(f"Scraped post {post_count}/{max_posts}: {post.shortcode}")
@@ -158,9 +236,39 @@ class InstagramScraper:
                 print(f"Error scraping post {post.shortcode}: {str(e)}")
                 continue
         
+        # Télécharger toutes les images en parallèle
+        image_paths = await asyncio.gather(*downloads)
+        for post_data, image_path in zip(posts_data, image_paths):
+            post_data["image_path"] = image_path
+        
         print(f"Successfully scraped {len(posts_data)} posts")
         return posts_data
     
+    def _post_metadata(self, post) -> Dict:
+        """
+        Extraire les métadonnées d'un post (appel bloquant)
+        
+        Args:
+            post: Objet Post d'Instaloader
+            
+        Returns:
+            Données du post
+        """
+        caption = post.caption if post.caption else ""
+        return {
+            "id": post.shortcode,
+            "caption": caption,
+            "likes": post.likes,
+            "comments_count": post.comments,
+            "date": post.date_utc.isoformat(),
+            "image_path": "",
+            "is_video": post.is_video,
+            "hashtags": extract_hashtags(caption),
+            "mentions": extract_mentions(caption),
+            "location": post.location.name if post.location else None,
+            "url": f"https://www.instagram.com/p/{post.shortcode}/"
+        }
+    
     async def _download_image(self, post, user_dir: str) -> str:
         """
         Télécharger l'image d'un post
@@ -182,10 +290,13 @@ class InstagramScraper:
             
             # Télécharger seulement si le fichier n'existe pas
             if not os.path.exists(filepath):
-                self.loader.download_pic(
-                    filename=filepath,
-                    url=post.url,
-                    mtime=post.date_utc
+                response = await self.http_client.get(post.url)
+                response.raise_for_status()
+                await asyncio.to_thread(
+                    self._write_image,
+                    filepath,
+                    response.content,
+                    post.date_utc
                 )
                 print(f"Downloaded image: {filename}")
             else:
@@ -199,6 +310,21 @@ class InstagramScraper:
         except Exception as e:
             print(f"Error downloading image: {str(e)}")
             return ""
+    
+    def _write_image(self, filepath: str, content: bytes, mtime: datetime):
+        """
+        Écrire une image sur le disque (appel bloquant)
+        
+        Args:
+            filepath: Chemin du fichier
+            content: Contenu de l'image
+            mtime: Date du post, utilisée comme date de modification
+        """
+        with open(filepath, "wb") as f:
+            f.write(content)
+        timestamp = mtime.timestamp()
+        os.utime(filepath, (timestamp, timestamp))
+    
     async def _extract_comments(self, post, max_comments: int = 5) -> List[str]:
             """
             Extraire les commentaires d'un post
@@ -210,19 +336,32 @@ class InstagramScraper:
             Returns:
                 Liste des commentaires
             """
-            comments = []
-            comment_count = 0
-            
             try:
-                for comment in post.get_comments():
-                    if comment_count >= max_comments:
-                        break
-                    
-                    if comment.text:
-                        comments.append(comment.text)
-                        comment_count += 1
+                # Vider le générateur de commentaires dans un thread
+                return await asyncio.to_thread(self._collect_comments, post, max_comments)
             except Exception as e:
                 print(f"Error extracting comments: {str(e)}")
+                return []
+        
+    def _collect_comments(self, post, max_comments: int) -> List[str]:
+            """
+            Parcourir les commentaires d'un post (appel bloquant)
+            
+            Args:
+                post: Objet Post d'Instaloader
+                max_comments: Nombre maximum de commentaires à extraire
+                
+            Returns:
+                Liste des commentaires
+            """
+            comments = []
+            
+            for comment in post.get_comments():
+                if len(comments) >= max_comments:
+                    break
+                
+                if comment.text:
+                    comments.append(comment.text)
             
             return comments
         
@@ -256,8 +395,9 @@ class InstagramScraper:
                 Dictionnaire avec les infos du profil
             """
             try:
-                profile = instaloader.Profile.from_username(
-                    self.loader.context, 
+                profile = await asyncio.to_thread(
+                    instaloader.Profile.from_username,
+                    self.loader.context,
                     username
                 )
                 
@@ -298,4 +438,10 @@ class InstagramScraper:
                         os.makedirs(self.download_dir, exist_ok=True)
                         print("Cleaned up all downloads")
             except Exception as e:
-                print(f"Error cleaning up: {str(e)}")
\ No newline at end of file
+                print(f"Error cleaning up: {str(e)}")
+    
+    async def close(self):
+            """
+            Fermer le client HTTP partagé
+            """
+            await self.http_client.aclose()
\ No newline at end of file
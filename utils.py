@@ -1,11 +1,46 @@
 import re
 import os
+import math
+import logging
+import string
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
 import hashlib
+import tempfile
+import time
+import numpy as np
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+_LOG = logging.getLogger(__name__)
+
+
+# Expressions régulières pré-compilées
+# URLs, mentions @ et hashtags, retirés en une seule passe. Une mention ou un
+# hashtag s'arrête avant une URL collée ("#tag_http://...") : l'URL gagne,
+# comme quand elle était retirée dans une passe séparée avant les tags
+_CLEAN_RE = re.compile(r'https?://\S+|[@#](?:(?!https?://\S)\w)+')
+_HASHTAG_CAP = re.compile(r'#(\w+)')
+_MENTION_CAP = re.compile(r'@(\w+)')
+_URL_VALID_RE = re.compile(r'^https?://(www\.)?instagram\.com/[\w.]+/?$')
+_USER_RE = re.compile(r'^[\w.]+$')
+
+# Caractères autorisés dans un username Instagram (ASCII uniquement)
+_ALLOWED = frozenset(string.ascii_letters + string.digits + '._')
+
 
 def extract_username(url: str) -> str:
     """
@@ -23,7 +58,18 @@ def extract_username(url: str) -> str:
     if not url.startswith('http'):
         return url
     
-    # Parser l'URL
+    # Chemin rapide : https://host/username[/...] sans query ni fragment
+    i = url.find('://')
+    if i >= 0 and '?' not in url and '#' not in url:
+        j = url.find('/', i + 3)
+        if j >= 0:
+            tail = url[j + 1:]
+            slash = tail.find('/')
+            username = tail[:slash] if slash >= 0 else tail
+            if username:
+                return username
+    
+    # Parser l'URL (cas particuliers)
     parsed = urlparse(url)
     path_parts = [p for p in parsed.path.split('/') if p]
     
@@ -47,12 +93,14 @@ def validate_url(url: str) -> bool:
     if not url:
         return False
     
-    patterns = [
-        r'^https?://(www\.)?instagram\.com/[\w\.]+/?$',
-        r'^[\w\.]+$'  # Juste le username
-    ]
+    url = url.strip()
+    if not url:
+        return False
     
-    return any(re.match(pattern, url.strip()) for pattern in patterns)
+    # URL de profil ou juste le username : un seul regex selon le préfixe
+    if url.startswith(('http://', 'https://')):
+        return bool(_URL_VALID_RE.match(url))
+    return bool(_USER_RE.match(url))
 
 
 def validate_username(username: str) -> bool:
@@ -69,8 +117,7 @@ def validate_username(username: str) -> bool:
         return False
     
     # Instagram usernames: lettres, chiffres, points, underscores
-    pattern = r'^[\w\.]+$'
-    return bool(re.match(pattern, username))
+    return not set(username).difference(_ALLOWED)
 
 
 def calculate_confidence(scores: Dict[str, float]) -> float:
@@ -87,18 +134,13 @@ def calculate_confidence(scores: Dict[str, float]) -> float:
         return 0.0
     
     # La confiance est basée sur le score maximum et la variance
-    values = list(scores.values())
-    max_score = max(values)
-    
-    # Calculer la variance
-    mean = sum(values) / len(values)
-    variance = sum((x - mean) ** 2 for x in values) / len(values)
+    values = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
     
     # Haute variance = plus de confiance (traits distincts)
     # Score maximum élevé = plus de confiance
-    confidence = (max_score * 0.7) + (min(variance * 2, 0.3))
+    confidence = (values.max() * 0.7) + (min(values.var() * 2, 0.3))
     
-    return min(confidence, 1.0)
+    return float(min(confidence, 1.0))
 
 
 def format_date(date_string: str) -> str:
@@ -111,6 +153,22 @@ def format_date(date_string: str) -> str:
     Returns:
         Date formatée
     """
+    # Chemin rapide : format fixe YYYY-MM-DDTHH:MM:SS exact (sans fraction
+    # ni fuseau, qui passent par fromisoformat)
+    if (isinstance(date_string, str) and len(date_string) == 19
+            and date_string[4] == '-' and date_string[7] == '-'
+            and date_string[10] in 'T ' and date_string[13] == ':'
+            and date_string[16] == ':'):
+        fields = (date_string[0:4], date_string[5:7], date_string[8:10],
+                  date_string[11:13], date_string[14:16], date_string[17:19])
+        if all(field.isascii() and field.isdigit() for field in fields):
+            try:
+                # Valide les plages (mois, jour, heure...) comme fromisoformat
+                datetime(*map(int, fields))
+            except ValueError:
+                return date_string
+            return date_string[:10] + ' ' + date_string[11:19]
+    
     try:
         dt = datetime.fromisoformat(date_string.replace('Z', '+00:00'))
         return dt.strftime('%Y-%m-%d %H:%M:%S')
@@ -131,22 +189,31 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Enlever les URLs
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-    
-    # Enlever les mentions @
-    text = re.sub(r'@[\w]+', '', text)
-    
-    # Enlever les hashtags multiples
-    text = re.sub(r'#[\w]+', '', text)
+    # Enlever les URLs, les mentions @ et les hashtags
+    text = _CLEAN_RE.sub('', text)
     
     # Enlever les emojis (optionnel)
     # text = text.encode('ascii', 'ignore').decode('ascii')
     
-    # Enlever les espaces multiples
-    text = re.sub(r'\s+', ' ', text)
+    # Enlever les espaces multiples : split() sans argument coupe sur les
+    # mêmes blancs que \s+ et ignore ceux des extrémités, donc ce join
+    # équivaut à re.sub(r'\s+', ' ', text).strip(), sans passer par le regex
+    return ' '.join(text.split())
+
+
+def clean_text_batch(texts: List[str]) -> List[str]:
+    """
+    Nettoyer une liste de textes (même traitement que clean_text)
     
-    return text.strip()
+    Args:
+        texts: Textes bruts
+        
+    Returns:
+        Textes nettoyés
+    """
+    # Méthode liée résolue une seule fois pour tout le batch
+    sub = _CLEAN_RE.sub
+    return [' '.join(sub('', text).split()) if text else "" for text in texts]
 
 
 def extract_hashtags(text: str) -> List[str]:
@@ -162,8 +229,8 @@ def extract_hashtags(text: str) -> List[str]:
     if not text:
         return []
     
-    hashtags = re.findall(r'#(\w+)', text)
-    return list(set(hashtags))  # Enlever les doublons
+    # Enlever les doublons en gardant l'ordre d'apparition
+    return list(dict.fromkeys(_HASHTAG_CAP.findall(text)))
 
 
 def extract_mentions(text: str) -> List[str]:
@@ -179,8 +246,14 @@ def extract_mentions(text: str) -> List[str]:
     if not text:
         return []
     
-    mentions = re.findall(r'@(\w+)', text)
-    return list(set(mentions))
+    return list(dict.fromkeys(_MENTION_CAP.findall(text)))
+
+
+def _hash_key(data: bytes) -> str:
+    """Hacher une clé de cache (xxh3 si disponible, sinon blake2b)"""
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
 
 
 def generate_cache_key(username: str, max_posts: int = 30) -> str:
@@ -194,8 +267,24 @@ def generate_cache_key(username: str, max_posts: int = 30) -> str:
     Returns:
         Clé de cache
     """
-    data = f"{username}_{max_posts}_{datetime.now().strftime('%Y%m%d')}"
-    return hashlib.md5(data.encode()).hexdigest()
+    # Numéro du jour (UTC) : la clé change une fois par jour
+    day = int(time.time() // 86400)
+    data = f"{username}_{max_posts}_{day}"
+    return _hash_key(data.encode())
+
+
+def _dumps(data) -> bytes:
+    """Sérialiser en JSON (orjson si disponible)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(raw: bytes):
+    """Désérialiser du JSON (orjson si disponible)"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def save_cache(cache_key: str, data: Dict, cache_dir: str = "cache") -> bool:
@@ -210,16 +299,37 @@ def save_cache(cache_key: str, data: Dict, cache_dir: str = "cache") -> bool:
     Returns:
         True si succès
     """
+    try:
+        # Sérialiser avant d'ouvrir le fichier : une donnée invalide ne
+        # laisse pas de fichier temporaire
+        payload = _dumps(data)
+    except (TypeError, ValueError) as e:
+        _LOG.warning("Error saving cache: %s", e)
+        return False
+    
+    cache_file = os.path.join(cache_dir, f"{cache_key}.json")
+    tmp_file = None
+    
     try:
         os.makedirs(cache_dir, exist_ok=True)
-        cache_file = os.path.join(cache_dir, f"{cache_key}.json")
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Écriture atomique : fichier temporaire puis renommage, un crash
+        # ne laisse jamais de JSON tronqué à la place du cache. Le nom
+        # temporaire est unique : deux écrivains de la même clé (threads ou
+        # workers) ne partagent jamais le même fichier
+        fd, tmp_file = tempfile.mkstemp(prefix=f"{cache_key}.", suffix=".tmp", dir=cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_file, cache_file)
         
         return True
-    except Exception as e:
-        print(f"Error saving cache: {str(e)}")
+    except OSError as e:
+        _LOG.warning("Error saving cache: %s", e)
+        if tmp_file is not None:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
         return False
 
 
@@ -238,20 +348,20 @@ def load_cache(cache_key: str, cache_dir: str = "cache", max_age_hours: int = 24
     try:
         cache_file = os.path.join(cache_dir, f"{cache_key}.json")
         
-        if not os.path.exists(cache_file):
+        # Un seul stat pour l'existence et l'âge du fichier
+        try:
+            st = os.stat(cache_file)
+        except FileNotFoundError:
             return None
         
         # Vérifier l'âge du fichier
-        file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-        age = datetime.now() - file_time
-        
-        if age.total_seconds() > max_age_hours * 3600:
+        if time.time() - st.st_mtime > max_age_hours * 3600:
             return None
         
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(cache_file, 'rb') as f:
+            return _loads(f.read())
     except Exception as e:
-        print(f"Error loading cache: {str(e)}")
+        _LOG.warning("Error loading cache: %s", e)
         return None
 
 
@@ -289,18 +399,15 @@ def normalize_scores(scores: Dict[str, float]) -> Dict[str, float]:
     if not scores:
         return {}
     
-    values = list(scores.values())
-    min_val = min(values)
-    max_val = max(values)
+    values = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    min_val = values.min()
+    value_range = values.max() - min_val
     
-    if max_val == min_val:
+    if value_range == 0:
         return {k: 0.5 for k in scores.keys()}
     
-    normalized = {}
-    for key, value in scores.items():
-        normalized[key] = (value - min_val) / (max_val - min_val)
-    
-    return normalized
+    normalized = (values - min_val) / value_range
+    return dict(zip(scores.keys(), normalized.tolist()))
 
 
 def merge_scores(text_scores: Dict[str, float], 
@@ -317,17 +424,50 @@ def merge_scores(text_scores: Dict[str, float],
     Returns:
         Scores fusionnés
     """
-    merged = {}
     image_weight = 1.0 - text_weight
     
-    all_keys = set(text_scores.keys()) | set(image_scores.keys())
-    
-    for key in all_keys:
-        text_val = text_scores.get(key, 0.5)
-        image_val = image_scores.get(key, 0.5)
-        merged[key] = (text_val * text_weight) + (image_val * image_weight)
-    
-    return merged
+    # Aligner les deux scores sur les mêmes clés (0.5 si absent)
+    all_keys = sorted(set(text_scores) | set(image_scores))
+    text_vals = np.fromiter((text_scores.get(k, 0.5) for k in all_keys), dtype=np.float64, count=len(all_keys))
+    image_vals = np.fromiter((image_scores.get(k, 0.5) for k in all_keys), dtype=np.float64, count=len(all_keys))
+    
+    merged = (text_vals * text_weight) + (image_vals * image_weight)
+    return dict(zip(all_keys, merged.tolist()))
+
+
+# Descriptions des traits Big Five par niveau
+_TRAIT_DESC = {
+    "Openness": {
+        "high": "Highly creative, curious, and open to new experiences. Enjoys exploring ideas and art.",
+        "medium": "Balanced between tradition and innovation. Open to new experiences but also values routine.",
+        "low": "More conventional and practical. Prefers familiar experiences and proven methods."
+    },
+    "Conscientiousness": {
+        "high": "Highly organized, responsible, and goal-oriented. Plans ahead and follows through.",
+        "medium": "Generally organized with some flexibility. Balances planning with spontaneity.",
+        "low": "More spontaneous and flexible. Prefers going with the flow rather than strict planning."
+    },
+    "Extraversion": {
+        "high": "Outgoing, energetic, and socially engaged. Draws energy from social interactions.",
+        "medium": "Ambivert - comfortable in both social and solitary settings.",
+        "low": "More reserved and introspective. Prefers quiet environments and smaller groups."
+    },
+    "Agreeableness": {
+        "high": "Highly cooperative, compassionate, and friendly. Values harmony and helping others.",
+        "medium": "Balanced between cooperation and independence. Can be both supportive and assertive.",
+        "low": "More independent and analytical. Prioritizes logic over emotions in decision-making."
+    },
+    "Neuroticism": {
+        "high": "More emotionally sensitive and reactive. May experience stress more intensely.",
+        "medium": "Emotionally balanced with normal stress responses. Generally stable mood.",
+        "low": "Emotionally stable and calm. Handles stress well and maintains composure."
+    }
+}
+
+# Niveaux indexés par bisect_right(_CUTS, score) : low < 0.4 <= medium <= 0.6 < high
+# (la seconde borne est le float juste au-dessus de 0.6, pour garder 0.6 en "medium")
+_LEVELS = ("low", "medium", "high")
+_CUTS = (0.4, math.nextafter(0.6, 1.0))
 
 
 def get_trait_description(trait: str, score: float) -> str:
@@ -341,36 +481,9 @@ def get_trait_description(trait: str, score: float) -> str:
     Returns:
         Description textuelle
     """
-    descriptions = {
-        "Openness": {
-            "high": "Highly creative, curious, and open to new experiences. Enjoys exploring ideas and art.",
-            "medium": "Balanced between tradition and innovation. Open to new experiences but also values routine.",
-            "low": "More conventional and practical. Prefers familiar experiences and proven methods."
-        },
-        "Conscientiousness": {
-            "high": "Highly organized, responsible, and goal-oriented. Plans ahead and follows through.",
-            "medium": "Generally organized with some flexibility. Balances planning with spontaneity.",
-            "low": "More spontaneous and flexible. Prefers going with the flow rather than strict planning."
-        },
-        "Extraversion": {
-            "high": "Outgoing, energetic, and socially engaged. Draws energy from social interactions.",
-            "medium": "Ambivert - comfortable in both social and solitary settings.",
-            "low": "More reserved and introspective. Prefers quiet environments and smaller groups."
-        },
-        "Agreeableness": {
-            "high": "Highly cooperative, compassionate, and friendly. Values harmony and helping others.",
-            "medium": "Balanced between cooperation and independence. Can be both supportive and assertive.",
-            "low": "More independent and analytical. Prioritizes logic over emotions in decision-making."
-        },
-        "Neuroticism": {
-            "high": "More emotionally sensitive and reactive. May experience stress more intensely.",
-            "medium": "Emotionally balanced with normal stress responses. Generally stable mood.",
-            "low": "Emotionally stable and calm. Handles stress well and maintains composure."
-        }
-    }
-    
-    level = "high" if score > 0.6 else "low" if score < 0.4 else "medium"
-    return descriptions.get(trait, {}).get(level, "No description available.")
+    # NaN ne se compare à rien : "medium", comme avant le passage à bisect
+    level = "medium" if math.isnan(score) else _LEVELS[bisect_right(_CUTS, score)]
+    return _TRAIT_DESC.get(trait, {}).get(level, "No description available.")
 
 
 def create_download_directory(username: str, base_dir: str = "downloads") -> str:
@@ -389,13 +502,63 @@ def create_download_directory(username: str, base_dir: str = "downloads") -> str
     return user_dir
 
 
-def cleanup_old_downloads(base_dir: str = "downloads", days: int = 7) -> int:
+def _iter_files(path: str):
+    """
+    Parcourir récursivement les fichiers d'un répertoire
+    
+    Args:
+        path: Répertoire à parcourir
+        
+    Returns:
+        Générateur de DirEntry (stat mis en cache par scandir)
+    """
+    # Comme os.walk : un répertoire illisible ou disparu est ignoré
+    try:
+        entries = os.scandir(path)
+    except OSError as e:
+        _LOG.warning("Error scanning %s: %s", path, e)
+        return
+    
+    with entries:
+        for entry in entries:
+            # Ne jamais suivre ni supprimer les liens symboliques
+            if entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            else:
+                yield entry
+
+
+def _maybe_unlink(entry: os.DirEntry, cutoff_time: float) -> int:
+    """
+    Supprimer un fichier s'il est plus ancien que la date limite
+    
+    Args:
+        entry: Fichier à vérifier
+        cutoff_time: Date limite (timestamp)
+        
+    Returns:
+        1 si le fichier a été supprimé, 0 sinon
+    """
+    try:
+        if entry.stat(follow_symlinks=False).st_mtime < cutoff_time:
+            os.unlink(entry.path)
+            return 1
+    except Exception as e:
+        _LOG.warning("Error deleting %s: %s", entry.path, e)
+    return 0
+
+
+def cleanup_old_downloads(base_dir: str = "downloads", days: int = 7,
+                          max_workers: int = 32) -> int:
     """
     Nettoyer les anciens téléchargements
     
     Args:
         base_dir: Répertoire de base
         days: Nombre de jours à conserver
+        max_workers: Nombre de threads pour les stat/unlink
         
     Returns:
         Nombre de fichiers supprimés
@@ -403,17 +566,9 @@ def cleanup_old_downloads(base_dir: str = "downloads", days: int = 7) -> int:
     if not os.path.exists(base_dir):
         return 0
     
-    deleted_count = 0
-    cutoff_time = datetime.now().timestamp() - (days * 86400)
-    
-    for root, dirs, files in os.walk(base_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if os.path.getmtime(file_path) < cutoff_time:
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"Error deleting {file_path}: {str(e)}")
+    cutoff_time = time.time() - (days * 86400)
+    entries = list(_iter_files(base_dir))
     
-    return deleted_count
\ No newline at end of file
+    # Les stat/unlink sont des appels I/O : les exécuter en parallèle
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(partial(_maybe_unlink, cutoff_time=cutoff_time), entries))
\ No newline at end of file